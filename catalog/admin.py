@@ -1,42 +1,342 @@
+import datetime
+import hashlib
+
 from django.contrib import admin
+from django.contrib.admin.utils import quote, unquote
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Aggregate, JSONField, OuterRef, QuerySet, Subquery
+from django.forms.models import BaseInlineFormSet, ModelChoiceIterator
+from django.http import Http404, HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
 from .models import Author, Genre, Book, BookInstance, Language
-from django.utils.translation import gettext_lazy as _
+from .signals import CHANGELIST_VERSION_CACHE_KEY, GENRE_CHOICES_CACHE_KEY
+from django.utils.translation import get_language, gettext_lazy as _
+
+
+class JSONGroupArray(Aggregate):
+    """Collect the values of a group into a list (JSONB_AGG on PostgreSQL)."""
+    function = 'JSON_GROUP_ARRAY'
+    output_field = JSONField()
+    allow_distinct = True
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='JSONB_AGG', **extra_context)
+
+def genre_choices():
+    """Return the (id, name) genre options, cached until a Genre is saved or deleted."""
+    choices = cache.get(GENRE_CHOICES_CACHE_KEY)
+    if choices is None:
+        choices = list(Genre.objects.values_list('id', 'name'))
+        cache.set(GENRE_CHOICES_CACHE_KEY, choices)
+    return choices
+
+class CachedGenreChoiceIterator(ModelChoiceIterator):
+    """Render the genre options from the cache instead of querying on every form."""
+    def __iter__(self):
+        return iter(genre_choices())
+
+    def __len__(self):
+        return len(genre_choices())
+
+    def __bool__(self):
+        return bool(genre_choices())
+
+class CachedChangeListMixin:
+    """Cache the rendered changelist of small, rarely edited models.
+
+    Pages are cached per session, language and URL for the cache's default
+    timeout, and are invalidated by the post_save/post_delete signals in
+    catalog.signals.
+    """
+    changelist_cache_timeout = DEFAULT_TIMEOUT
+
+    def get_changelist_cache_key(self, request):
+        label = self.model._meta.label_lower
+        version = cache.get(CHANGELIST_VERSION_CACHE_KEY % label, 0)
+        url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f'changelist:{label}:{version}:{request.session.session_key}:{get_language()}:{url}'
+
+    def changelist_view(self, request, extra_context=None):
+        # A page showing pending messages must be rendered fresh and not be stored
+        if request.method != 'GET' or get_messages(request):
+            return super().changelist_view(request, extra_context)
+        # The cached page is shared for the whole session, so check access on every hit
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        key = self.get_changelist_cache_key(request)
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().changelist_view(request, extra_context)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            response.render()
+            cache.set(key, response.content, self.changelist_cache_timeout)
+        return response
+
+@admin.register(Genre)
+class GenreAdmin(CachedChangeListMixin, admin.ModelAdmin):
+    pass
+
+@admin.register(Language)
+class LanguageAdmin(CachedChangeListMixin, admin.ModelAdmin):
+    search_fields = ('name',)
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset that only edits one page of the related objects."""
+    per_page = 25
+    page_number = None
+    page_url = ''
+
+    def get_queryset(self):
+        if not hasattr(self, 'page'):
+            # A submitted formset is matched against the page it was rendered with
+            page_number = self.data.get(self.add_prefix('page')) if self.is_bound else self.page_number
+            queryset = super().get_queryset()
+            # The model ordering may have ties (e.g. due_back), so add the pk to keep pages stable
+            queryset = queryset.order_by(*(queryset.query.order_by or self.model._meta.ordering), 'pk')
+            self.page = Paginator(queryset, self.per_page).get_page(page_number)
+        return self.page.object_list
+
+    @property
+    def page_range(self):
+        return self.page.paginator.get_elided_page_range(self.page.number)
+
+class PaginatedTabularInline(admin.TabularInline):
+    formset = PaginatedInlineFormSet
+    template = 'admin/catalog/paginated_tabular.html'
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get('page')
+        return formset
+
+class LazyInlineMixin:
+    """Load the inline formsets of the change form on demand.
 
-admin.site.register(Genre)
-admin.site.register(Language)
+    The change form renders a placeholder for each inline, and fetches its
+    formset from the ``<object_id>/inline/<prefix>/`` view into the form when
+    the user opens it. Inlines that weren't loaded are left out on save.
+    """
+    change_form_template = 'admin/catalog/change_form_lazy_inlines.html'
 
-class BooksInline(admin.TabularInline):
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('<path:object_id>/inline/<str:prefix>/', self.admin_site.admin_view(self.inline_view),
+                 name='%s_%s_inline' % info),
+        ] + super().get_urls()
+
+    def get_lazy_inlines(self, request, obj):
+        """Return (inline, formset class, prefix) for every inline of obj."""
+        lazy_inlines = []
+        for inline in super().get_inline_instances(request, obj):
+            FormSet = inline.get_formset(request, obj)
+            lazy_inlines.append((inline, FormSet, FormSet.get_default_prefix()))
+        return lazy_inlines
+
+    def get_inline_instances(self, request, obj=None):
+        if obj is None:
+            # The add form has no related objects to load
+            return super().get_inline_instances(request, obj)
+        return [inline for inline, FormSet, prefix in self.get_lazy_inlines(request, obj)
+                if request.method == 'POST' and f'{prefix}-TOTAL_FORMS' in request.POST]
+
+    def inline_view(self, request, object_id, prefix):
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        for inline, FormSet, inline_prefix in self.get_lazy_inlines(request, obj):
+            if inline_prefix == prefix:
+                break
+        else:
+            raise Http404
+        formset = FormSet(**self.get_formset_kwargs(request, obj, inline, prefix))
+        formset.page_url = request.path
+        inline_admin_formset, = self.get_inline_formsets(request, [formset], [inline], obj)
+        return TemplateResponse(request, inline.template, {'inline_admin_formset': inline_admin_formset})
+
+    def render_change_form(self, request, context, add=False, change=False, form_url='', obj=None):
+        if obj is not None:
+            rendered = {inline_admin_formset.formset.prefix
+                        for inline_admin_formset in context['inline_admin_formsets']}
+            info = self.model._meta.app_label, self.model._meta.model_name
+            lazy_inlines = []
+            media = context['media']
+            for inline, FormSet, prefix in self.get_lazy_inlines(request, obj):
+                if prefix in rendered:
+                    continue
+                lazy_inlines.append({
+                    'title': inline.verbose_name_plural,
+                    'url': reverse('admin:%s_%s_inline' % info, args=[quote(obj.pk), prefix],
+                                   current_app=self.admin_site.name),
+                })
+                # The loaded formset needs the same scripts as a rendered inline
+                empty_formset = FormSet(instance=obj, prefix=prefix, queryset=inline.get_queryset(request).none())
+                media = media + inline.media + empty_formset.media
+            context.update(lazy_inlines=lazy_inlines, media=media)
+        return super().render_change_form(request, context, add, change, form_url, obj)
+
+class BooksInline(PaginatedTabularInline):
     """Defines format of inline book insertion (used in AuthorAdmin)"""
     model = Book
+    autocomplete_fields = ('language',)
+
 # Define the admin class
 @admin.register(Author)
-class AuthorAdmin(admin.ModelAdmin):
+class AuthorAdmin(LazyInlineMixin, admin.ModelAdmin):
     list_display = ('last_name', 'first_name', 'date_of_birth', 'date_of_death')
     fields = ['first_name', 'last_name', ('date_of_birth', 'date_of_death')]
+    search_fields = ('last_name', 'first_name')
     inlines = [BooksInline]
 
 # admin.site.register(Book)
 # admin.site.register(BookInstance)
 # Register the Admin classes for Book using the decorator
 
-class BooksInstanceInline(admin.TabularInline):
+class BooksInstanceInline(PaginatedTabularInline):
     model = BookInstance
+    autocomplete_fields = ('borrower',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('book', 'borrower')
+
+class BookChangeList(ChangeList):
+    def get_queryset(self, request):
+        # Only the listed columns are needed, don't ship the summary for every row
+        return super().get_queryset(request).only('title', 'author__first_name', 'author__last_name')
+
+    def get_results(self, request):
+        super().get_results(request)
+        # Annotate only the rows of the page, after the counts have run. Each row
+        # gets its first 3 distinct genre names by name from a correlated subquery,
+        # so the outer query needs no join or GROUP BY, and display_genre needs
+        # neither a second query nor Genre instances.
+        book_genres = Book.genre.through.objects
+        first_names = (book_genres.filter(book=OuterRef(OuterRef('pk'))).order_by('genre__name')
+                       .values('genre__name').distinct()[:3])
+        genre_names = (book_genres.filter(book=OuterRef('pk'), genre__name__in=Subquery(first_names))
+                       .values('book').annotate(names=JSONGroupArray('genre__name', distinct=True))
+                       .values('names'))
+        self.result_list = self.result_list.annotate(
+            _genre_names=Subquery(genre_names, output_field=JSONField()))
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(LazyInlineMixin, admin.ModelAdmin):
     list_display = ('title', 'author', 'display_genre')
+    list_select_related = ('author',)
+    autocomplete_fields = ('author', 'language')
     inlines = [BooksInstanceInline]
 
+    def get_changelist(self, request, **kwargs):
+        return BookChangeList
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_manytomany(db_field, request, **kwargs)
+        if db_field.name == 'genre':
+            # Submitted values are still validated against the queryset
+            formfield.iterator = CachedGenreChoiceIterator
+            formfield.widget.choices = formfield.choices
+        return formfield
+
+class DueBackListFilter(admin.SimpleListFilter):
+    """Filter book instances by fixed due date buckets relative to today."""
+    title = _('Due back')
+    parameter_name = 'due'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('overdue', _('Overdue')),
+            ('week', _('Due within a week')),
+            ('month', _('Due within a month')),
+            ('later', _('Due later')),
+        )
+
+    def queryset(self, request, queryset):
+        today = datetime.date.today()
+        if self.value() == 'overdue':
+            return queryset.filter(due_back__lt=today)
+        if self.value() == 'week':
+            return queryset.filter(due_back__range=(today, today + datetime.timedelta(days=6)))
+        if self.value() == 'month':
+            return queryset.filter(due_back__range=(today, today + datetime.timedelta(days=29)))
+        if self.value() == 'later':
+            return queryset.filter(due_back__gte=today + datetime.timedelta(days=30))
+
+class EstimatedCountPaginator(Paginator):
+    """Use the planner's row estimate instead of COUNT(*) for unfiltered PostgreSQL tables."""
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            connection = connections[self.object_list.db]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                                   [connection.ops.quote_name(self.object_list.model._meta.db_table)])
+                    row = cursor.fetchone()
+                # reltuples is -1 until the table has been analyzed
+                if row is not None and row[0] >= 0:
+                    return row[0]
+        return super().count
+
 # Register the Admin classes for BookInstance using the decorator
 @admin.register(BookInstance)
 class BookInstanceAdmin(admin.ModelAdmin):
-    list_display = ('book', 'status', 'borrower', 'due_back', 'id')
-    list_filter = ('status', 'due_back')
+    list_display = ('book_title', 'status', 'borrower', 'due_back', 'uuid')
+    list_filter = ('status', DueBackListFilter)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    list_per_page = 25
+    list_max_show_all = 200
+    sortable_by = ('status', 'due_back')
+    list_select_related = ('borrower',)
+    readonly_fields = ('uuid',)
     fieldsets = (
         (None, {
-            'fields': ('book', 'imprint', 'id')
+            'fields': ('book', 'imprint', 'uuid')
         }),
         (_('Availability'), {
             'fields': ('status', 'due_back', 'borrower')
         }),
     )
+
+    def get_changelist_instance(self, request):
+        cl = super().get_changelist_instance(request)
+        # Fetch the titles of every book on the page in one query instead of
+        # loading each Book row alongside its copies
+        titles = dict(Book.objects.filter(id__in={obj.book_id for obj in cl.result_list})
+                      .order_by().values_list('id', 'title'))
+        for obj in cl.result_list:
+            obj._book_title = titles.get(obj.book_id)
+        return cl
+
+    @admin.display(description=_('Book'))
+    def book_title(self, obj):
+        if hasattr(obj, '_book_title'):
+            return obj._book_title
+        return obj.book.title
+
+    def get_deleted_objects(self, objs, request):
+        # The delete confirmation lists str() of every copy, which reads the book title
+        if isinstance(objs, QuerySet):
+            objs = objs.select_related('book')
+        return super().get_deleted_objects(objs, request)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # The dropdowns only render __str__, so don't load the other columns
+        if db_field.name == 'book':
+            kwargs['queryset'] = Book.objects.only('title')
+        elif db_field.name == 'borrower':
+            kwargs['queryset'] = User.objects.only('username')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
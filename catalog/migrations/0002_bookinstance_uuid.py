@@ -0,0 +1,61 @@
+from django.db import migrations, models
+from django.db.models import F
+import uuid
+
+
+def copy_id_to_uuid(apps, schema_editor):
+    """Keep the existing public identifier of every copy in the new uuid column."""
+    BookInstance = apps.get_model('catalog', 'BookInstance')
+    BookInstance.objects.update(uuid=F('id'))
+
+
+def copy_uuid_to_id(apps, schema_editor):
+    BookInstance = apps.get_model('catalog', 'BookInstance')
+    BookInstance.objects.update(id=F('uuid'))
+
+
+def number_ids(apps, schema_editor):
+    """Replace the old UUID primary keys with sequential integers (still stored as text)."""
+    BookInstance = apps.get_model('catalog', 'BookInstance')
+    old_ids = BookInstance.objects.order_by('uuid').values_list('id', flat=True)
+    for number, old_id in enumerate(list(old_ids), start=1):
+        BookInstance.objects.filter(id=old_id).update(id=str(number))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookinstance',
+            name='uuid',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_id_to_uuid, copy_uuid_to_id),
+        migrations.AlterField(
+            model_name='bookinstance',
+            name='uuid',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, help_text='Unique ID for this particular bookacross whole library', unique=True),
+        ),
+        # Go through a text column, which both UUIDs and integers can be cast to and from,
+        # so the primary key can be swapped in place and the migration stays reversible
+        migrations.AlterField(
+            model_name='bookinstance',
+            name='id',
+            field=models.CharField(max_length=36, primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(number_ids, copy_uuid_to_id),
+        migrations.AlterField(
+            model_name='bookinstance',
+            name='id',
+            field=models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID'),
+        ),
+        migrations.AlterField(
+            model_name='language',
+            name='name',
+            field=models.CharField(help_text="Enter the book's natural language (e.g. English, French, Japanese etc.)", max_length=200, verbose_name='Language'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.13 on 2026-10-15 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_bookinstance_uuid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookinstance',
+            name='due_back',
+            field=models.DateField(blank=True, db_index=True, null=True, verbose_name='Due back'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinstance',
+            index=models.Index(fields=['status', 'due_back'], name='bookinstance_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+LOAN_STATUS_CODES = {'m': '0', 'o': '1', 'a': '2', 'r': '3'}
+
+
+def letters_to_numbers(apps, schema_editor):
+    BookInstance = apps.get_model('catalog', 'BookInstance')
+    for letter, number in LOAN_STATUS_CODES.items():
+        BookInstance.objects.filter(status=letter).update(status=number)
+    # The old field allowed a blank status, treat it as maintenance
+    BookInstance.objects.filter(status='').update(status=LOAN_STATUS_CODES['m'])
+
+
+def numbers_to_letters(apps, schema_editor):
+    BookInstance = apps.get_model('catalog', 'BookInstance')
+    for letter, number in LOAN_STATUS_CODES.items():
+        BookInstance.objects.filter(status=number).update(status=letter)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(letters_to_numbers, numbers_to_letters),
+        migrations.AlterField(
+            model_name='bookinstance',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Maintenance'), (1, 'On loan'), (2, 'Available'), (3, 'Reserved')], default=0, help_text='Book availability', verbose_name='Status'),
+        ),
+    ]
@@ -1,10 +1,25 @@
 from django.db import models
-from django.urls import reverse
+from django.urls import get_script_prefix, get_urlconf, reverse
+import functools
 import uuid # Required for unique book instances
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import User
 from datetime import date
 
+# Stands in for the pk when reversing a URL template, no real pk or URL prefix contains it
+_URL_PK_PLACEHOLDER = '4611686018427387905'
+
+@functools.lru_cache(maxsize=None)
+def _url_template(name, urlconf, script_prefix):
+  """Reverse the named URL once and split it around the pk."""
+  head, placeholder, tail = reverse(name, urlconf=urlconf, args=[_URL_PK_PLACEHOLDER]).rpartition(_URL_PK_PLACEHOLDER)
+  return head, tail
+
+def detail_url(name, pk):
+  """Return the URL of the named detail view for pk, without resolving it every time."""
+  head, tail = _url_template(name, get_urlconf(), get_script_prefix())
+  return f'{head}{pk}{tail}'
+
 class Genre(models.Model):
   """Model representing a book genre."""
   name = models.CharField(_('Genre'), max_length=200, help_text=_('Enter a book genre (e.g.Science Fiction)'))
@@ -33,6 +48,7 @@ class Book(models.Model):
 
   class Meta:
     ordering = ['title', 'author']
+    indexes = [models.Index(fields=['title', 'author'], name='book_title_author_idx')]
 
   def __str__(self):
     """String for representing the Model object."""
@@ -40,35 +56,70 @@ class Book(models.Model):
   
   def get_absolute_url(self):
     """Returns the url to access a detail record for this book."""
-    return reverse('book-detail', args=[str(self.id)])
+    return detail_url('book-detail', self.id)
   
   def display_genre(self):
     """Create a string for the Genre. This is required to display genre in Admin."""
-    return ', '.join(genre.name for genre in self.genre.all()[:3])
+    if hasattr(self, '_genre_names'):
+      # Already collected by the database (see BookChangeList.get_results), in
+      # no particular order since JSON_GROUP_ARRAY can't sort
+      return ', '.join(sorted(self._genre_names or []))
+    return ', '.join(self.genre.order_by('name').values_list('name', flat=True).distinct()[:3])
 
   display_genre.short_description = 'Genre'
   
+class BookInstanceQuerySet(models.QuerySet):
+    def with_overdue(self):
+        """Compute is_overdue in the database for every row."""
+        return self.annotate(_overdue=models.Case(
+            models.When(due_back__lt=date.today(), then=models.Value(True)),
+            default=models.Value(False), output_field=models.BooleanField()))
+
 class BookInstance(models.Model):
     """Model representing a specific copy of a book (i.e. that can be borrowed from the library)."""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, help_text=_('Unique ID for this particular bookacross whole library'))
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False, help_text=_('Unique ID for this particular bookacross whole library'))
     book = models.ForeignKey('Book', verbose_name=_('Book'), on_delete=models.RESTRICT)
     imprint = models.CharField(_('Imprint'), max_length=200)
-    due_back = models.DateField(_('Due back'), null=True, blank=True)
+    due_back = models.DateField(_('Due back'), null=True, blank=True, db_index=True)
     borrower = models.ForeignKey(User, verbose_name=_('Borrower'), on_delete=models.SET_NULL, null=True, blank=True)
-    LOAN_STATUS = (('m', _('Maintenance')),('o', _('On loan')),('a', _('Available')),('r', _('Reserved')),)
-    status = models.CharField(_('Status'), max_length=1,choices=LOAN_STATUS,blank=True,default='m',help_text=_('Book availability'),)
+
+    class LoanStatus(models.IntegerChoices):
+        MAINTENANCE = 0, _('Maintenance')
+        ON_LOAN = 1, _('On loan')
+        AVAILABLE = 2, _('Available')
+        RESERVED = 3, _('Reserved')
+
+    status = models.PositiveSmallIntegerField(_('Status'), choices=LoanStatus.choices, default=LoanStatus.MAINTENANCE, help_text=_('Book availability'))
+
+    objects = BookInstanceQuerySet.as_manager()
     
     class Meta:
        ordering = ['due_back']
+       indexes = [models.Index(fields=['status', 'due_back'], name='bookinstance_status_due_idx')]
        permissions = (("can_mark_returned", _("Set book as returned")),)
     
     def __str__(self):
         """String for representing the Model object."""
-        return f'{self.id} ({self.book.title})'
+        # Cached per instance and book, the admin renders it many times per page
+        cached = self.__dict__.get('_str_cache')
+        if cached is None or cached[0] != self.book_id:
+            cached = self._str_cache = (self.book_id, f'{self.uuid} ({self.book.title})')
+        return cached[1]
+
+    def save(self, *args, **kwargs):
+        self.__dict__.pop('_str_cache', None)
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_str_cache', None)
+        super().refresh_from_db(*args, **kwargs)
     
     @property
     def is_overdue(self):
-        return self.due_back and date.today() > self.due_back
+        if hasattr(self, '_overdue'):
+            # Annotated by BookInstanceQuerySet.with_overdue()
+            return self._overdue
+        return bool(self.due_back and date.today() > self.due_back)
     
 class Author(models.Model):
     """Model representing an author."""
@@ -79,10 +130,11 @@ class Author(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [models.Index(fields=['last_name', 'first_name'], name='author_name_idx')]
 
     def get_absolute_url(self):
         """Returns the url to access a particular author instance."""
-        return reverse('author-detail', args=[str(self.id)])
+        return detail_url('author-detail', self.id)
 
     def __str__(self):
         """String for representing the Model object."""
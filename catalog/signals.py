@@ -0,0 +1,23 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Genre, Language
+
+GENRE_CHOICES_CACHE_KEY = 'genre_choices'
+CHANGELIST_VERSION_CACHE_KEY = 'changelist_version:%s'
+
+
+@receiver([post_save, post_delete], sender=Genre)
+def clear_genre_choices(sender, **kwargs):
+    """Drop the cached genre options used by the Book admin form."""
+    cache.delete(GENRE_CHOICES_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Language)
+def bump_changelist_version(sender, **kwargs):
+    """Invalidate the cached admin changelist pages of the model."""
+    cache.set(CHANGELIST_VERSION_CACHE_KEY % sender._meta.label_lower, time.time(), None)
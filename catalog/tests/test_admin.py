@@ -0,0 +1,294 @@
+from django.test import TestCase
+
+# Create your tests here.
+
+import datetime
+
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Author, Book, BookInstance, Genre, Language
+
+
+class BookAdminTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(first_name='John', last_name='Smith')
+        genres = [Genre.objects.create(name='Genre {0}'.format(i)) for i in range(4)]
+        book = Book.objects.create(title='Book Title', summary='My book summary', isbn='ABCDEFG',
+                                   author=author, language=Language.objects.create(name='English'))
+        book.genre.set(genres)
+        Book.objects.create(title='No Genre', summary='Summary', isbn='HIJKLMN', author=author)
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.model_admin = site._registry[Book]
+        self.request = RequestFactory().get('/admin/catalog/book/')
+        self.request.user = self.superuser
+
+    def test_display_genre_is_collected_by_the_database(self):
+        self.client.force_login(self.superuser)
+        books = list(self.client.get('/admin/catalog/book/').context['cl'].result_list)
+        with self.assertNumQueries(0):
+            genres = {book.title: book.display_genre() for book in books}
+        self.assertEqual(genres['Book Title'], 'Genre 0, Genre 1, Genre 2')
+        self.assertEqual(genres['No Genre'], '')
+
+    def test_display_genre_lists_the_first_distinct_names(self):
+        book = Book.objects.get(isbn='HIJKLMN')
+        book.genre.set([Genre.objects.create(name=name) for name in ('Poetry', 'Drama', 'Poetry', 'Crime', 'Art')])
+        self.client.force_login(self.superuser)
+        books = self.client.get('/admin/catalog/book/').context['cl'].result_list
+        self.assertEqual([b.display_genre() for b in books if b.pk == book.pk], ['Art, Crime, Drama'])
+        self.assertEqual(Book.objects.get(pk=book.pk).display_genre(), 'Art, Crime, Drama')
+
+    def test_get_queryset_is_not_annotated(self):
+        self.assertNotIn('_genre_names', self.model_admin.get_queryset(self.request).query.annotations)
+
+    def test_changelist_queries_are_not_grouped(self):
+        self.client.force_login(self.superuser)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/admin/catalog/book/')
+        book_queries = [query['sql'] for query in queries if query['sql'].startswith('SELECT COUNT(*)')
+                        or 'FROM "catalog_book"' in query['sql']]
+        self.assertEqual(len(book_queries), 3)
+        for sql in book_queries:
+            self.assertFalse(sql.endswith('GROUP BY "catalog_book"."id"'))
+            self.assertNotIn('LEFT OUTER JOIN "catalog_book_genre"', sql)
+
+    def test_changelist_loads(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get('/admin/catalog/book/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Book Title')
+
+    def test_change_form_uses_autocomplete_for_foreign_keys(self):
+        self.client.force_login(self.superuser)
+        book = Book.objects.get(isbn='ABCDEFG')
+        response = self.client.get('/admin/catalog/book/{0}/change/'.format(book.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'data-field-name="author"')
+        self.assertContains(response, 'data-field-name="language"')
+        genre = Genre.objects.get(name='Genre 0')
+        self.assertContains(response, '<option value="{0}" selected>Genre 0</option>'.format(genre.pk), html=True)
+
+    def test_changelist_defers_unlisted_columns(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get('/admin/catalog/book/')
+        book = response.context['cl'].result_list[0]
+        self.assertEqual(book.get_deferred_fields(), {'summary', 'isbn', 'language_id'})
+        with self.assertNumQueries(0):
+            str(book.author)
+
+    def test_genre_choices_are_cached_until_genres_change(self):
+        model_admin_form = self.model_admin.get_form(self.request)
+        self.assertEqual([label for value, label in model_admin_form().fields['genre'].choices],
+                         ['Genre 0', 'Genre 1', 'Genre 2', 'Genre 3'])
+        with self.assertNumQueries(0):
+            list(model_admin_form().fields['genre'].choices)
+        Genre.objects.create(name='Genre 4')
+        self.assertIn('Genre 4', [label for value, label in model_admin_form().fields['genre'].choices])
+
+    def test_book_instances_are_loaded_on_demand(self):
+        book = Book.objects.get(isbn='ABCDEFG')
+        BookInstance.objects.bulk_create(
+            BookInstance(book=book, imprint='Copy {0}'.format(i)) for i in range(30))
+        self.client.force_login(self.superuser)
+        url = '/admin/catalog/book/{0}/inline/bookinstance_set/'.format(book.pk)
+        response = self.client.get('/admin/catalog/book/{0}/change/'.format(book.pk))
+        self.assertNotContains(response, 'Copy 0')
+        self.assertContains(response, 'href="{0}"'.format(url))
+        self.assertContains(response, 'admin/js/inlines.js')
+        response = self.client.get(url)
+        self.assertEqual(response.context['inline_admin_formset'].formset.initial_form_count(), 25)
+        self.assertContains(response, 'href="{0}?page=2"'.format(url))
+        self.assertContains(response, 'data-field-name="borrower"')
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(response.context['inline_admin_formset'].formset.initial_form_count(), 5)
+        self.assertContains(response, 'name="bookinstance_set-page" value="2"')
+
+    def test_book_instance_pages_are_stable_with_tied_due_dates(self):
+        book = Book.objects.get(isbn='ABCDEFG')
+        BookInstance.objects.bulk_create(
+            BookInstance(book=book, imprint='Copy {0}'.format(i), due_back=datetime.date(2030, 1, 1))
+            for i in range(30))
+        self.client.force_login(self.superuser)
+        url = '/admin/catalog/book/{0}/inline/bookinstance_set/'.format(book.pk)
+        formsets = [self.client.get(url, {'page': page}).context['inline_admin_formset'].formset for page in (1, 2)]
+        self.assertEqual(formsets[0].page.paginator.object_list.query.order_by, ('due_back', 'pk'))
+        ids = [copy.pk for formset in formsets for copy in formset.get_queryset()]
+        self.assertEqual(ids, sorted(BookInstance.objects.values_list('pk', flat=True)))
+
+    def test_loaded_book_instances_are_saved_with_the_book(self):
+        book = Book.objects.get(isbn='ABCDEFG')
+        BookInstance.objects.bulk_create(
+            BookInstance(book=book, imprint='Copy {0}'.format(i)) for i in range(30))
+        self.client.force_login(self.superuser)
+        formset = self.client.get('/admin/catalog/book/{0}/inline/bookinstance_set/'.format(book.pk),
+                                  {'page': 2}).context['inline_admin_formset'].formset
+        data = {
+            'title': 'New Title', 'author': book.author_id, 'summary': book.summary, 'isbn': book.isbn,
+            'language': book.language_id, 'genre': [genre.pk for genre in book.genre.all()],
+            'bookinstance_set-page': 2,
+            'bookinstance_set-TOTAL_FORMS': 5, 'bookinstance_set-INITIAL_FORMS': 5,
+        }
+        for i, copy in enumerate(formset.get_queryset()):
+            prefix = 'bookinstance_set-{0}-'.format(i)
+            data.update({prefix + 'id': copy.pk, prefix + 'book': book.pk, prefix + 'status': copy.status,
+                         prefix + 'imprint': copy.imprint + ' edited'})
+        response = self.client.post('/admin/catalog/book/{0}/change/'.format(book.pk), data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Book.objects.get(pk=book.pk).title, 'New Title')
+        self.assertEqual(BookInstance.objects.filter(imprint__endswith=' edited').count(), 5)
+
+    def test_invalid_book_form_does_not_link_inline_pages(self):
+        book = Book.objects.get(isbn='ABCDEFG')
+        BookInstance.objects.bulk_create(
+            BookInstance(book=book, imprint='Copy {0}'.format(i)) for i in range(30))
+        self.client.force_login(self.superuser)
+        response = self.client.post('/admin/catalog/book/{0}/change/'.format(book.pk), {
+            'title': '', 'bookinstance_set-page': 1,
+            'bookinstance_set-TOTAL_FORMS': 0, 'bookinstance_set-INITIAL_FORMS': 0,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'name="bookinstance_set-page"')
+        self.assertNotContains(response, '?page=2')
+
+    def test_book_is_saved_without_loading_book_instances(self):
+        book = Book.objects.get(isbn='ABCDEFG')
+        self.client.force_login(self.superuser)
+        response = self.client.post('/admin/catalog/book/{0}/change/'.format(book.pk), {
+            'title': 'New Title', 'author': book.author_id, 'summary': book.summary, 'isbn': book.isbn,
+            'language': book.language_id, 'genre': [genre.pk for genre in book.genre.all()],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Book.objects.get(pk=book.pk).title, 'New Title')
+
+    def test_author_books_are_loaded_on_demand(self):
+        author = Author.objects.get(last_name='Smith')
+        self.client.force_login(self.superuser)
+        response = self.client.get('/admin/catalog/author/{0}/inline/book_set/'.format(author.pk))
+        self.assertContains(response, 'Book Title')
+        self.assertContains(response, 'No Genre')
+        self.assertContains(response, 'data-field-name="language"')
+
+    def test_inline_view_requires_staff(self):
+        book = Book.objects.get(isbn='ABCDEFG')
+        response = self.client.get('/admin/catalog/book/{0}/inline/bookinstance_set/'.format(book.pk))
+        self.assertEqual(response.status_code, 302)
+
+
+class BookInstanceAdminTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(first_name='John', last_name='Smith')
+        cls.book = Book.objects.create(title='Book Title', summary='My book summary',
+                                       isbn='ABCDEFG', author=author)
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def test_add_form_lists_books_and_borrowers(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get('/admin/catalog/bookinstance/add/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<option value="{0}">Book Title</option>'.format(self.book.pk), html=True)
+        self.assertContains(response, '<option value="{0}">admin</option>'.format(self.superuser.pk), html=True)
+
+    def test_due_back_filter(self):
+        today = datetime.date.today()
+        for days in (-3, 2, 20, 60):
+            BookInstance.objects.create(book=self.book, imprint='Due in {0}'.format(days),
+                                        due_back=today + datetime.timedelta(days=days))
+        self.client.force_login(self.superuser)
+        expected = {
+            'overdue': ['Due in -3'],
+            'week': ['Due in 2'],
+            'month': ['Due in 2', 'Due in 20'],
+            'later': ['Due in 60'],
+        }
+        for value, imprints in expected.items():
+            response = self.client.get('/admin/catalog/bookinstance/', {'due': value})
+            self.assertEqual(response.status_code, 200)
+            result = sorted(obj.imprint for obj in response.context['cl'].result_list)
+            self.assertEqual(result, imprints)
+
+    def test_changelist_book_titles_are_fetched_once(self):
+        other = Book.objects.create(title='Other Title', summary='Summary', isbn='HIJKLMN')
+        for book in (self.book, other, other):
+            BookInstance.objects.create(book=book, imprint='Imprint')
+        self.client.force_login(self.superuser)
+        response = self.client.get('/admin/catalog/bookinstance/')
+        self.assertContains(response, 'Book Title')
+        self.assertContains(response, 'Other Title', count=2)
+        with self.assertNumQueries(0):
+            for obj in response.context['cl'].result_list:
+                self.assertIn(obj._book_title, ('Book Title', 'Other Title'))
+
+    def test_changelist_book_titles_are_not_joined_or_sorted(self):
+        BookInstance.objects.create(book=self.book, imprint='Imprint')
+        self.client.force_login(self.superuser)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/admin/catalog/bookinstance/')
+        title_queries = [query['sql'] for query in queries if query['sql'].startswith('SELECT "catalog_book"."id"')]
+        self.assertEqual(len(title_queries), 1)
+        self.assertNotIn('JOIN', title_queries[0])
+        self.assertNotIn('ORDER BY', title_queries[0])
+
+    def test_delete_confirmation_loads_books_with_copies(self):
+        book_instances = [BookInstance.objects.create(book=self.book, imprint='Imprint') for i in range(3)]
+        self.client.force_login(self.superuser)
+
+        def confirm_delete(objs):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/admin/catalog/bookinstance/', {
+                    'action': 'delete_selected',
+                    '_selected_action': [obj.pk for obj in objs],
+                })
+            self.assertContains(response, 'Book Title', count=len(objs))
+            return len(queries)
+
+        self.assertEqual(confirm_delete(book_instances[:1]), confirm_delete(book_instances))
+
+    def test_changelist_count_is_exact_without_postgresql(self):
+        BookInstance.objects.create(book=self.book, imprint='Imprint')
+        self.client.force_login(self.superuser)
+        response = self.client.get('/admin/catalog/bookinstance/')
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class GenreAdminTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Genre.objects.create(name='Fantasy')
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def test_changelist_is_cached_until_a_genre_is_saved(self):
+        self.assertContains(self.client.get('/admin/catalog/genre/'), 'Fantasy')
+        # update() sends no signal, so the cached page is still served
+        Genre.objects.update(name='Science Fiction')
+        self.assertContains(self.client.get('/admin/catalog/genre/'), 'Fantasy')
+        Genre.objects.create(name='Poetry')
+        response = self.client.get('/admin/catalog/genre/')
+        self.assertContains(response, 'Science Fiction')
+        self.assertContains(response, 'Poetry')
+
+    def test_cached_changelist_checks_permissions(self):
+        staff = User.objects.create_user('staff', password='password', is_staff=True)
+        staff.user_permissions.add(Permission.objects.get(codename='view_genre'))
+        self.client.force_login(staff)
+        self.assertContains(self.client.get('/admin/catalog/genre/'), 'Fantasy')
+        staff.user_permissions.clear()
+        self.assertEqual(self.client.get('/admin/catalog/genre/').status_code, 403)
+
+    def test_changelist_cache_depends_on_the_query(self):
+        self.client.get('/admin/catalog/genre/')
+        response = self.client.get('/admin/catalog/genre/', {'q': 'Fantasy'})
+        self.assertIn('cl', response.context)
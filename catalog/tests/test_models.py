@@ -2,7 +2,11 @@ from django.test import TestCase
 
 # Create your tests here.
 
-from catalog.models import Author
+import datetime
+
+from django.urls import set_script_prefix
+
+from catalog.models import Author, Book, BookInstance
 
 
 class AuthorModelTest(TestCase):
@@ -48,7 +52,49 @@ class AuthorModelTest(TestCase):
 
         self.assertEqual(str(author), expected_object_name)
 
+    def test_object_name_follows_unsaved_changes(self):
+        author = Author.objects.get(id=1)
+        str(author)
+        author.last_name = 'Smith'
+        self.assertEqual(str(author), 'Smith, Big')
+
     def test_get_absolute_url(self):
         author = Author.objects.get(id=1)
         # This will also fail if the urlconf is not defined.
         self.assertEqual(author.get_absolute_url(), '/catalog/author/1')
+
+    def test_get_absolute_url_uses_script_prefix(self):
+        author = Author.objects.get(id=1)
+        set_script_prefix('/library/')
+        try:
+            self.assertEqual(author.get_absolute_url(), '/library/catalog/author/1')
+        finally:
+            set_script_prefix('/')
+
+
+class BookInstanceModelTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        book = Book.objects.create(title='Book Title', summary='My book summary', isbn='ABCDEFG')
+        today = datetime.date.today()
+        BookInstance.objects.create(book=book, imprint='Overdue', due_back=today - datetime.timedelta(days=1))
+        BookInstance.objects.create(book=book, imprint='Due today', due_back=today)
+        BookInstance.objects.create(book=book, imprint='No due date')
+
+    def test_object_name_follows_the_book(self):
+        book_instance = BookInstance.objects.get(imprint='Overdue')
+        self.assertEqual(str(book_instance), '{0} (Book Title)'.format(book_instance.uuid))
+        book_instance.book = Book.objects.create(title='Other Title', summary='Summary', isbn='HIJKLMN')
+        self.assertEqual(str(book_instance), '{0} (Other Title)'.format(book_instance.uuid))
+        Book.objects.filter(title='Book Title').update(title='New Title')
+        book_instance.refresh_from_db()
+        self.assertEqual(str(book_instance), '{0} (New Title)'.format(book_instance.uuid))
+
+    def test_is_overdue(self):
+        overdue = {obj.imprint: obj.is_overdue for obj in BookInstance.objects.all()}
+        self.assertEqual(overdue, {'Overdue': True, 'Due today': False, 'No due date': False})
+
+    def test_is_overdue_annotated_matches_property(self):
+        overdue = {obj.imprint: obj.is_overdue for obj in BookInstance.objects.with_overdue()}
+        self.assertEqual(overdue, {'Overdue': True, 'Due today': False, 'No due date': False})
@@ -2,10 +2,13 @@ from django.test import TestCase
 
 # Create your tests here.
 
+import datetime
 
-from catalog.models import Author
+from django.contrib.auth.models import Permission, User
 from django.urls import reverse
 
+from catalog.models import Author, Book, BookInstance
+
 
 class AuthorListViewTest(TestCase):
 
@@ -44,3 +47,41 @@ class AuthorListViewTest(TestCase):
         self.assertTrue('is_paginated' in response.context)
         self.assertTrue(response.context['is_paginated'] is True)
         self.assertEqual(len(response.context['author_list']), 3)
+
+
+class RenewBookInstancesViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        librarian = User.objects.create_user(username='librarian', password='1X<ISRUkw+tuK')
+        librarian.user_permissions.add(Permission.objects.get(codename='can_mark_returned'))
+        author = Author.objects.create(first_name='John', last_name='Smith')
+        book = Book.objects.create(title='Book Title', summary='My book summary',
+                                   isbn='ABCDEFG', author=author)
+        cls.book_instance = BookInstance.objects.create(
+            book=book, imprint='Unlikely Imprint, 2016', status=BookInstance.LoanStatus.ON_LOAN,
+            due_back=datetime.date.today() + datetime.timedelta(days=5))
+
+    def test_view_url_uses_uuid(self):
+        url = reverse('renew-book-librarian', kwargs={'uuid': self.book_instance.uuid})
+        self.assertEqual(url, '/catalog/book/{0}/renew/'.format(self.book_instance.uuid))
+
+    def test_librarian_can_renew_by_uuid(self):
+        self.client.login(username='librarian', password='1X<ISRUkw+tuK')
+        response = self.client.get(reverse('renew-book-librarian', args=[self.book_instance.uuid]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'catalog/book_renew_librarian.html')
+
+
+class BookDetailViewTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(title='Book Title', summary='My book summary', isbn='ABCDEFG')
+        BookInstance.objects.create(book=cls.book, imprint='Imprint', status=BookInstance.LoanStatus.AVAILABLE)
+
+    def test_available_copy_is_highlighted(self):
+        response = self.client.get(reverse('book-detail', args=[self.book.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'class="text-success"')
+        self.assertContains(response, 'Available')
@@ -19,8 +19,8 @@ def index(request):
     num_visits = request.session.get('num_visits', 0)
     request.session['num_visits'] = num_visits + 1
 
-  # Available books (status = 'a')
-    num_instances_available = BookInstance.objects.filter(status__exact='a').count()
+  # Available books
+    num_instances_available = BookInstance.objects.filter(status__exact=BookInstance.LoanStatus.AVAILABLE).count()
     # The 'all()' is implied by default.
     num_authors = Author.objects.count()
 
@@ -57,7 +57,7 @@ class LoanedBooksByUserListView(LoginRequiredMixin, generic.ListView):
     paginate_by = 10
     
     def get_queryset(self):
-        return BookInstance.objects.filter(borrower=self.request.user, status__exact='o').order_by('due_back')
+        return BookInstance.objects.filter(borrower=self.request.user, status__exact=BookInstance.LoanStatus.ON_LOAN).with_overdue().order_by('due_back')
 
 class LoanedBooksAllListView(PermissionRequiredMixin, generic.ListView):
     """Generic class-based view listing all books on loan. Only visible to users with can_mark_returned permission."""
@@ -67,13 +67,13 @@ class LoanedBooksAllListView(PermissionRequiredMixin, generic.ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        return BookInstance.objects.filter(status__exact='o').order_by('due_back')
+        return BookInstance.objects.filter(status__exact=BookInstance.LoanStatus.ON_LOAN).with_overdue().order_by('due_back')
 
 @login_required
 @permission_required('catalog.can_mark_returned', raise_exception=True)
-def renew_book_librarian(request, pk):
+def renew_book_librarian(request, uuid):
     """View function for renewing a specific BookInstance by librarian."""
-    book_instance = get_object_or_404(BookInstance, pk=pk)
+    book_instance = get_object_or_404(BookInstance, uuid=uuid)
 
     # If this is a POST request then process the Form data
     if request.method == 'POST':